@@ -1,4 +1,7 @@
 import asyncio as aio
+import logging
+import time
+from collections import defaultdict
 from collections.abc import AsyncGenerator
 from typing import Any, Self, override
 
@@ -8,7 +11,20 @@ from fastapi.routing import APIRouter
 
 from .client import HubitatClient, HubitatDevice, HubitatDeviceEvent
 from .misc import HUBITAT_ACCESS_TOKEN, HUBITAT_ADDRESS, HUBITAT_APP_ID, get_env
-from .utility import HubitatCondition, HubitatUtility
+from .utility import (
+    ANY_ATTRIBUTE,
+    DeviceEventHandler,
+    HubitatCondition,
+    HubitatUtility,
+)
+
+logger = logging.getLogger(__name__)
+
+# Device events buffered before the oldest ones start getting dropped
+MAX_QUEUED_EVENTS = 10_000
+
+# Minimum number of seconds between warnings about dropped events
+DROPPED_EVENTS_LOG_INTERVAL = 10.0
 
 
 class HubitatPlugin(CosmoPlugin):
@@ -19,8 +35,12 @@ class HubitatPlugin(CosmoPlugin):
         self._devices = devices
 
         # Async state tracking
-        self._event_q: aio.Queue[tuple[int, str, Any]] = aio.Queue()
-        self._conditions_for_device: dict[int, dict[int, HubitatCondition]] = {}
+        self._event_q: aio.Queue[tuple[int, str, Any]] = aio.Queue(MAX_QUEUED_EVENTS)
+        self._dropped_events = 0
+        self._dropped_events_logged_at = float("-inf")
+        self._conditions_by_key: defaultdict[
+            tuple[int, str], dict[int, tuple[HubitatCondition, DeviceEventHandler]]
+        ] = defaultdict(dict)
 
     @classmethod
     async def create(cls) -> Self:
@@ -38,18 +58,34 @@ class HubitatPlugin(CosmoPlugin):
 
     @override
     async def run(self) -> AsyncGenerator[list[AbstractCondition], None]:
-        while True:
-            (device_id, attr_name, new_value) = await self._event_q.get()
-
-            # Notify and store conditions that are impacted by this change
-            conditions: list[AbstractCondition] = []
-            for condition in self._conditions_for_device.get(device_id, {}).values():
-                condition.on_device_event(device_id, attr_name, new_value)
-                conditions.append(condition)
-
-            # Let the rule engine know some conditions are changed
-            if len(conditions) > 0:
-                yield conditions
+        command_worker = aio.create_task(self._he_client.run_command_worker())
+        try:
+            while True:
+                # Wait for one event, then drain whatever else arrived in the same burst
+                events = [await self._event_q.get()]
+                while True:
+                    try:
+                        events.append(self._event_q.get_nowait())
+                    except aio.QueueEmpty:
+                        break
+
+                # Notify and store conditions subscribed to this attribute (or the
+                # device), reporting each impacted condition only once per batch
+                conditions: dict[int, AbstractCondition] = {}
+                for device_id, attr_name, new_value in events:
+                    for key in ((device_id, attr_name), (device_id, ANY_ATTRIBUTE)):
+                        bucket = self._conditions_by_key.get(key, {})
+                        for condition, handler in bucket.values():
+                            handler(device_id, attr_name, new_value)
+                            conditions[condition.instance_id] = condition
+
+                # Let the rule engine know some conditions are changed
+                if len(conditions) > 0:
+                    yield list(conditions.values())
+        finally:
+            # The plugin is shutting down, stop sending commands and release the hub
+            command_worker.cancel()
+            await self._he_client.aclose()
 
     @override
     def get_rule_utility(self) -> object | None:
@@ -57,26 +93,45 @@ class HubitatPlugin(CosmoPlugin):
 
     def register_condition(self, condition: HubitatCondition):
         """Registers the condition with the plugin so we can notify of device events."""
-        for device_id in condition.get_device_ids():
-            if device_id not in self._conditions_for_device:
-                self._conditions_for_device[device_id] = {}
-            if condition.instance_id not in self._conditions_for_device[device_id]:
-                self._conditions_for_device[device_id][condition.instance_id] = condition
+        for key in condition.get_subscriptions():
+            self._conditions_by_key[key][condition.instance_id] = (
+                condition,
+                condition.get_event_handler(key),
+            )
 
     def unregister_condition(self, condition: HubitatCondition):
         """Removes the condition from tracking."""
-        for device_id in condition.get_device_ids():
-            if device_id in self._conditions_for_device:
-                # Remove the condition from the device's condition map
-                if condition.instance_id in self._conditions_for_device[device_id]:
-                    del self._conditions_for_device[device_id][condition.instance_id]
-
-                    # If no more conditions are tracking this device, remove it
-                    if len(self._conditions_for_device[device_id]) == 0:
-                        del self._conditions_for_device[device_id]
+        for key in condition.get_subscriptions():
+            bucket = self._conditions_by_key.get(key, {})
+            bucket.pop(condition.instance_id, None)
+            if not bucket:
+                # If no more conditions are tracking this subscription, remove it
+                self._conditions_by_key.pop(key, None)
 
     async def _on_device_event(self, event: HubitatDeviceEvent) -> dict:
         """Invoked when we encounter a device event."""
+        # Keep cached attribute values in line with the hub
+        self._he_client.update_attribute_value(
+            event.device_id, event.attribute, event.value
+        )
+
         # Queue up the event for processing in the plugin task.
-        await self._event_q.put((int(event.device_id), event.attribute, event.value))
+        item = (event.device_id, event.attribute, event.value)
+        try:
+            self._event_q.put_nowait(item)
+        except aio.QueueFull:
+            # We're falling behind the hub, make room by dropping the oldest event
+            self._event_q.get_nowait()
+            self._event_q.put_nowait(item)
+            self._on_event_dropped()
         return {"result": "success"}
+
+    def _on_event_dropped(self):
+        """Counts a dropped event, logging the running total at a limited rate."""
+        self._dropped_events += 1
+        now = time.monotonic()
+        if now - self._dropped_events_logged_at >= DROPPED_EVENTS_LOG_INTERVAL:
+            self._dropped_events_logged_at = now
+            logger.warning(
+                f"Event queue is full, {self._dropped_events} device events dropped"
+            )
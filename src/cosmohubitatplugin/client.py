@@ -1,19 +1,35 @@
+import asyncio as aio
 import logging
+import time
+from collections import defaultdict
 from typing import Any
 from urllib.parse import quote
 
 import httpx
-from pydantic import BaseModel, Field
+import orjson
+from pydantic import BaseModel, Field, PrivateAttr
 
 from .driver import DeviceCapability, load_hubitat_capabilities
 
 logger = logging.getLogger(__name__)
 
+# How long (in seconds) a fetched device listing is served before refetching
+DEFAULT_DEVICES_TTL = 30.0
+
+# Timeout (in seconds) for requests made to the hub
+REQUEST_TIMEOUT = 10.0
+
+# Maximum number of device commands in flight to the hub at once
+MAX_CONCURRENT_COMMANDS = 8
+
+# A device command as (device id, command name, optional arguments)
+type DeviceCommand = tuple[int, str, list[Any] | None]
+
 
 class HubitatDeviceEvent(BaseModel):
     """Represents an event from a Hubitat device."""
 
-    device_id: str = Field(alias="deviceId")
+    device_id: int = Field(alias="deviceId")
     attribute: str = Field(alias="name")
     value: Any | None = None
 
@@ -37,6 +53,18 @@ class HubitatDevice(BaseModel):
     attributes: list[DeviceAttribute]
     capabilities: dict[str, DeviceCapability]
 
+    # Lookup indices built once so per-event attribute/command checks are O(1)
+    _attr_by_name: dict[str, DeviceAttribute] = PrivateAttr(default_factory=dict)
+    _command_names: set[str] = PrivateAttr(default_factory=set)
+
+    def model_post_init(self, context: Any, /) -> None:
+        self._attr_by_name = {attr.name: attr for attr in self.attributes}
+        self._command_names = {
+            cmd.name
+            for capability in self.capabilities.values()
+            for cmd in capability.commands
+        }
+
     @classmethod
     def from_api_data(
         cls, device_data: dict, capabilities_map: dict[str, DeviceCapability]
@@ -50,41 +78,56 @@ class HubitatDevice(BaseModel):
         Returns:
             HubitatDevice instance with transformed data
         """
-        transformed_data = {
-            **device_data,  # Direct field mapping for id, name, label, type, room, etc.
-            "attributes": cls._parse_attributes(device_data.get("attributes", {})),
-            "capabilities": cls._parse_capabilities(
+        # The API data has a known shape, so skip re-validating it field by field
+        return cls.model_construct(
+            id=str(device_data["id"]),
+            name=device_data["name"],
+            date=device_data.get("date"),
+            label=device_data["label"],
+            type=device_data["type"],
+            room=device_data.get("room"),
+            model=device_data.get("model"),
+            manufacturer=device_data.get("manufacturer"),
+            attributes=cls._parse_attributes(device_data.get("attributes", [])),
+            capabilities=cls._parse_capabilities(
                 device_data.get("capabilities", []), capabilities_map
             ),
-        }
-        # Remove API fields that don't belong to our model
-        transformed_data.pop("commands", None)
-        return cls(**transformed_data)
+        )
 
     @classmethod
-    def _parse_attributes(cls, api_attributes: dict) -> list[DeviceAttribute]:
-        """Parse API attributes dict into list of DeviceAttribute objects.
+    def _parse_attributes(
+        cls, api_attributes: list[dict] | dict
+    ) -> list[DeviceAttribute]:
+        """Parse API attributes into a list of DeviceAttribute objects.
+
+        The API either reports a list of attribute entries, each carrying its own
+        name, currentValue, dataType and values, or a flat dict of attribute names to
+        current values. The flat dict's 'dataType'/'values' keys can't be tied to a
+        specific attribute, so no metadata is recorded for that shape.
 
         Args:
-            api_attributes: Raw attributes dict from API
+            api_attributes: Raw attributes list or dict from API
 
         Returns:
             List of DeviceAttribute objects
         """
-        attributes = []
-        metadata_fields = {"dataType", "values"}
-
-        for attr_name, value in api_attributes.items():
-            if attr_name not in metadata_fields:
-                attributes.append(
-                    DeviceAttribute(
-                        name=attr_name,
-                        current_value=value,
-                        data_type=api_attributes.get("dataType"),
-                        values=api_attributes.get("values"),
-                    )
-                )
-        return attributes
+        if isinstance(api_attributes, dict):
+            metadata_fields = {"dataType", "values"}
+            return [
+                DeviceAttribute.model_construct(name=attr_name, current_value=value)
+                for attr_name, value in api_attributes.items()
+                if attr_name not in metadata_fields
+            ]
+
+        return [
+            DeviceAttribute.model_construct(
+                name=attr["name"],
+                current_value=attr.get("currentValue"),
+                data_type=attr.get("dataType"),
+                values=attr.get("values"),
+            )
+            for attr in api_attributes
+        ]
 
     @classmethod
     def _parse_capabilities(
@@ -116,7 +159,7 @@ class HubitatDevice(BaseModel):
         Returns:
             True if the device has the attribute, False otherwise
         """
-        return any(attr.name == attr_name for attr in self.attributes)
+        return attr_name in self._attr_by_name
 
     def has_command(self, command_name: str) -> bool:
         """Check if the device has a command with the given name.
@@ -127,10 +170,7 @@ class HubitatDevice(BaseModel):
         Returns:
             True if the device has the command, False otherwise
         """
-        for capability in self.capabilities.values():
-            if any(cmd.name == command_name for cmd in capability.commands):
-                return True
-        return False
+        return command_name in self._command_names
 
     def get_attr_value(self, attr_name: str) -> Any:
         """Get the current value of an attribute by name.
@@ -144,71 +184,247 @@ class HubitatDevice(BaseModel):
         Raises:
             AttributeError: If the attribute is not found on the device
         """
-        for attr in self.attributes:
-            if attr.name == attr_name:
-                return attr.current_value
-        raise AttributeError(f"Attribute '{attr_name}' not found on device {self.id}")
+        try:
+            return self._attr_by_name[attr_name].current_value
+        except KeyError:
+            raise AttributeError(
+                f"Attribute '{attr_name}' not found on device {self.id}"
+            ) from None
+
+    def set_attr_value(self, attr_name: str, value: Any):
+        """Set the current value of an attribute by name.
+
+        Args:
+            attr_name: The name of the attribute to update
+            value: The new value of the attribute
+
+        Raises:
+            AttributeError: If the attribute is not found on the device
+        """
+        try:
+            self._attr_by_name[attr_name].current_value = value
+        except KeyError:
+            raise AttributeError(
+                f"Attribute '{attr_name}' not found on device {self.id}"
+            ) from None
 
 
 class HubitatClient:
     """Wrapper around Hubitat functionalities."""
 
-    def __init__(self, address: str, app_id: str, access_token: str):
+    def __init__(
+        self,
+        address: str,
+        app_id: str,
+        access_token: str,
+        devices_ttl: float = DEFAULT_DEVICES_TTL,
+    ):
         """Initialize the Hubitat client with connection details."""
         self._address = f"http://{address}/apps/api/{app_id}"
         self._token = access_token
         self._capabilities = load_hubitat_capabilities()
 
-    async def _make_request(self, url: str) -> httpx.Response:
-        async with httpx.AsyncClient() as client:
-            try:
-                resp = await client.get(url, params={"access_token": self._token})
-            except httpx.HTTPStatusError as error:
-                raise Exception(
-                    f"HE Client returned '{error.response.status_code}' "
-                    f"status: {error.response.text}"
-                ) from error
-            except Exception as error:
-                logger.error(f"HE Client returned error: {error}", exc_info=True)
-                raise
+        # Shared HTTP client so connections to the hub are pooled and kept alive
+        self._http = httpx.AsyncClient(
+            base_url=self._address,
+            params={"access_token": self._token},
+            timeout=REQUEST_TIMEOUT,
+            limits=httpx.Limits(max_keepalive_connections=10),
+        )
+
+        # Device listing cache, refreshed once it is older than the TTL
+        self._devices_ttl = devices_ttl
+        self._devices_cache: dict[int, HubitatDevice] | None = None
+        self._devices_cache_ts: float = 0.0
+        self._devices_lock = aio.Lock()
+
+        # Device events seen while a listing is being fetched, replayed onto it after
+        self._pending_updates: dict[tuple[int, str], Any] | None = None
+
+        # Outbound commands, sent by run_command_worker()
+        self._out_q: aio.Queue[DeviceCommand] = aio.Queue()
+        self._command_limit = aio.Semaphore(MAX_CONCURRENT_COMMANDS)
 
-        if resp.status_code != 200:
+    async def aclose(self):
+        """Closes the underlying HTTP connections to the hub."""
+        await self._http.aclose()
+
+    async def _make_request(self, path: str) -> httpx.Response:
+        try:
+            resp = await self._http.get(path)
+            resp.raise_for_status()
+        except httpx.HTTPStatusError as error:
+            # httpx's message has the full URL, which carries the access token
             raise Exception(
-                f"HE Client returned '{resp.status_code}' status: {resp.text}"
-            )
+                f"HE Client returned '{error.response.status_code}' status "
+                f"for '{path}': {error.response.text}"
+            ) from None
+        except httpx.HTTPError as error:
+            logger.error(f"HE Client returned error: {error}", exc_info=True)
+            raise
 
         return resp
 
     async def send_command(
         self, device_id: int, command: str, arguments: list[Any] | None = None
     ):
-        """Send a command with optional arguments to a device.
+        """Queue a command with optional arguments to be sent to a device.
+
+        The command is sent in the background by run_command_worker(); use flush() to
+        wait until it has been delivered.
 
         Args:
             device_id: The ID of the device to send the command to
             command: The command to send
             arguments: Optional list of arguments for the command
         """
-        url = f"{self._address}/devices/{device_id}/{command}"
+        await self._out_q.put((device_id, command, arguments))
+
+    async def flush(self):
+        """Wait until every queued command has been sent to the hub."""
+        await self._out_q.join()
+
+    async def send_commands_batch(self, commands: list[DeviceCommand]):
+        """Send several commands to the hub at once, bypassing the command queue.
+
+        Commands for the same device are sent in order, different devices are sent
+        concurrently. Every command is attempted even if some of them fail.
+
+        Args:
+            commands: The (device id, command, arguments) commands to send
+
+        Raises:
+            ExceptionGroup: The errors of every command that failed, once all the
+                commands have finished
+        """
+        errors = await self._send_batch(commands)
+        if len(errors) > 0:
+            raise ExceptionGroup("Failed to send device commands", errors)
+
+    async def run_command_worker(self):
+        """Drain the command queue forever, sending each burst of commands at once."""
+        while True:
+            # Wait for one command, then take whatever else was queued alongside it
+            batch = [await self._out_q.get()]
+            while True:
+                try:
+                    batch.append(self._out_q.get_nowait())
+                except aio.QueueEmpty:
+                    break
+
+            # Only mark the batch done once every send has finished, so flush() and
+            # per-device ordering hold across batches
+            try:
+                for error in await self._send_batch(batch):
+                    logger.error("Failed to send queued device command", exc_info=error)
+            finally:
+                for _ in batch:
+                    self._out_q.task_done()
+
+    async def _send_batch(self, commands: list[DeviceCommand]) -> list[Exception]:
+        """Sends the commands grouped by device, returning the errors of failed ones."""
+        by_device: defaultdict[int, list[DeviceCommand]] = defaultdict(list)
+        for item in commands:
+            by_device[item[0]].append(item)
+
+        results = await aio.gather(
+            *(self._send_in_order(items) for items in by_device.values()),
+            return_exceptions=True,
+        )
+
+        errors: list[Exception] = []
+        for result in results:
+            if isinstance(result, list):
+                errors.extend(result)
+            elif isinstance(result, Exception):
+                errors.append(result)
+            else:
+                # Cancellation and other BaseExceptions must not be swallowed
+                raise result
+        return errors
+
+    async def _send_in_order(self, commands: list[DeviceCommand]) -> list[Exception]:
+        errors: list[Exception] = []
+        for device_id, command, arguments in commands:
+            try:
+                await self._send_command_http(device_id, command, arguments)
+            except Exception as error:
+                error.add_note(f"Sending '{command}' to device {device_id}")
+                errors.append(error)
+        return errors
+
+    async def _send_command_http(
+        self, device_id: int, command: str, arguments: list[Any] | None = None
+    ):
+        url = f"/devices/{device_id}/{command}"
         if arguments is not None and len(arguments) > 0:
             url += f"/{','.join(str(arg) for arg in arguments)}"
 
-        await self._make_request(url)
+        async with self._command_limit:
+            await self._make_request(url)
 
     async def get_all_devices(self) -> dict[int, HubitatDevice]:
         """Get all devices from the Hubitat hub.
 
+        The result is cached and only refetched from the hub once it is older than
+        the configured TTL or after invalidate_devices() is called.
+
         Returns:
             List of HubitatDevice objects representing all devices on the hub
 
         Raises:
             Exception: If the API request fails or returns an error status
         """
-        url = f"{self._address}/devices/all"
+        async with self._devices_lock:
+            if (
+                self._devices_cache is None
+                or time.monotonic() - self._devices_cache_ts >= self._devices_ttl
+            ):
+                self._pending_updates = {}
+                try:
+                    devices = await self._fetch_all_devices()
+
+                    # The listing may predate events received during the fetch
+                    for (device_id, attr_name), value in self._pending_updates.items():
+                        device = devices.get(device_id)
+                        if device is not None and device.has_attribute(attr_name):
+                            device.set_attr_value(attr_name, value)
+                finally:
+                    self._pending_updates = None
+                self._devices_cache = devices
+                self._devices_cache_ts = time.monotonic()
+            return self._devices_cache
+
+    def invalidate_devices(self):
+        """Drops the cached device listing so the next read refetches from the hub."""
+        self._devices_cache = None
+
+    def update_attribute_value(self, device_id: int, attr_name: str, value: Any):
+        """Applies a device event to the cached device listing, if present.
+
+        Args:
+            device_id: The ID of the device the event came from
+            attr_name: The name of the attribute that changed
+            value: The new value of the attribute
+        """
+        if self._pending_updates is not None:
+            self._pending_updates[(device_id, attr_name)] = value
+
+        if self._devices_cache is None or device_id not in self._devices_cache:
+            return
+        device = self._devices_cache[device_id]
+        if device.has_attribute(attr_name):
+            device.set_attr_value(attr_name, value)
+        else:
+            # An attribute we haven't seen yet, pick it up on the next read
+            self.invalidate_devices()
+
+    async def _fetch_all_devices(self) -> dict[int, HubitatDevice]:
+        url = "/devices/all"
         response = await self._make_request(url)
 
         try:
-            devices_data = response.json()
+            devices_data = orjson.loads(response.content)
         except ValueError as error:
             raise Exception(
                 f"Failed to parse device response as JSON: {error}"
@@ -261,7 +477,7 @@ class HubitatClient:
         encoded_url = quote(webhook_url, safe="")
 
         # Build the postURL endpoint with the encoded webhook URL
-        url = f"{self._address}/postURL/{encoded_url}"
+        url = f"/postURL/{encoded_url}"
 
         logger.debug(f"Registering webhook URL with Hubitat: '{webhook_url}'")
 
@@ -1,6 +1,7 @@
-import json
-from pathlib import Path
+import functools
+from importlib.resources import files
 
+import orjson
 from pydantic import BaseModel
 
 
@@ -83,40 +84,40 @@ class HubitatCapabilities(BaseModel):
     capabilities: list[DeviceCapability]
 
 
-# Global cache for capabilities to avoid re-loading JSON file
-_capabilities_cache: dict[str, DeviceCapability] | None = None
-
-
+@functools.cache
 def load_hubitat_capabilities() -> dict[str, DeviceCapability]:
     """Load Hubitat capabilities from the JSON data file.
 
-    This function caches the capabilities data after the first load to avoid
-    repeatedly reading and parsing the JSON file.
+    The result is cached for the life of the process, so every client shares the same
+    capability objects and the bundled file is only read and parsed once.
 
     Returns:
         dict[str, DeviceCapability]: Mapping of names to DeviceCapability objects
 
     Raises:
         FileNotFoundError: If the capabilities JSON file is not found
-        json.JSONDecodeError: If the JSON file is malformed
+        orjson.JSONDecodeError: If the JSON file is malformed
     """
-    global _capabilities_cache
-
-    # Return cached data if available
-    if _capabilities_cache is not None:
-        return _capabilities_cache
-
-    # Load and cache the capabilities data
-    current_dir = Path(__file__).parent
-    capabilities_file = current_dir / "data" / "hubitat_capabilities.json"
-
-    if not capabilities_file.exists():
-        raise FileNotFoundError(f"Capabilities file not found: {capabilities_file}")
-
-    with open(capabilities_file, encoding="utf-8") as f:
-        data = json.load(f)
-
-    _capabilities_cache = {
-        cap.name: cap for cap in HubitatCapabilities(**data).capabilities
+    capabilities_file = files(__package__).joinpath("data", "hubitat_capabilities.json")
+    data = orjson.loads(capabilities_file.read_bytes())
+
+    # The bundled catalog is trusted, so build the models without validation
+    return {
+        cap["name"]: DeviceCapability.model_construct(
+            name=cap["name"],
+            attributes=[
+                CapabilityAttribute.model_construct(**attr) for attr in cap["attributes"]
+            ],
+            commands=[
+                CapabilityCommand.model_construct(
+                    name=cmd["name"],
+                    arguments=[
+                        CapabilityCommandArgument.model_construct(**arg)
+                        for arg in cmd.get("arguments", [])
+                    ],
+                )
+                for cmd in cap["commands"]
+            ],
+        )
+        for cap in data["capabilities"]
     }
-    return _capabilities_cache
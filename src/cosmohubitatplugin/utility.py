@@ -1,4 +1,6 @@
 from abc import abstractmethod
+from collections.abc import Callable
+from operator import eq, ge, gt, le, lt, ne
 from typing import TYPE_CHECKING, Any, override
 
 from cosmo.rules.model import AbstractCondition
@@ -8,8 +10,74 @@ from .client import HubitatClient, HubitatDevice
 if TYPE_CHECKING:
     from . import HubitatPlugin
 
+# Subscription attribute name matching every attribute of a device
+ANY_ATTRIBUTE = "*"
+
+# Callback invoked with (device id, attribute name, new value) for a device event
+type DeviceEventHandler = Callable[[int, str, Any], None]
+
+# Comparison function backing each supported condition operator
+COMPARISON_OPERATORS: dict[str, Callable[[Any, Any], Any]] = {
+    "=": eq,
+    "==": eq,
+    "!=": ne,
+    "<>": ne,
+    ">": gt,
+    ">=": ge,
+    "<": lt,
+    "<=": le,
+}
+
+
+def _resolve_operator(operator: str) -> Callable[[Any, Any], Any]:
+    """Look up the comparison function for a condition operator.
+
+    Raises:
+        ValueError: If the operator is not supported
+    """
+    try:
+        return COMPARISON_OPERATORS[operator]
+    except KeyError:
+        raise ValueError(f"Unknown operator: {operator}") from None
+
+
+def _compare_values(compare: Callable[[Any, Any], Any], left: Any, right: Any) -> bool:
+    """Apply a comparison function, treating ordering against None as false."""
+    if left is None or right is None:
+        # Ordering comparisons with None are undefined
+        return (compare is eq or compare is ne) and bool(compare(left, right))
+    return bool(compare(left, right))
+
+
+def _cast_bool(value: Any) -> bool:
+    """Cast a device value to a boolean, understanding common 'truthy' states."""
+    if isinstance(value, str):
+        return value.lower() in ("true", "1", "yes", "on", "active", "open")
+    return bool(value)
+
+
+def _cast_int(value: Any) -> int | float:
+    """Cast a device value to an int, keeping the fraction of decimal readings."""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            pass
+
+    # int() would truncate a decimal reading, so only convert whole numbers
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+
+def _identity(value: Any) -> Any:
+    return value
+
 
 class HubitatCondition(AbstractCondition):
+    __slots__ = ("_plugin",)
+
     def __init__(self, plugin: "HubitatPlugin"):
         super().__init__()
         self._plugin = plugin
@@ -24,6 +92,22 @@ class HubitatCondition(AbstractCondition):
         """Retrieves the list of device id's handled by this condition."""
         ...
 
+    def get_subscriptions(self) -> list[tuple[int, str]]:
+        """Retrieves the (device id, attribute name) pairs this condition listens to.
+
+        Defaults to every attribute of each device from get_device_ids().
+        """
+        return [(device_id, ANY_ATTRIBUTE) for device_id in self.get_device_ids()]
+
+    def get_event_handler(self, subscription: tuple[int, str]) -> DeviceEventHandler:
+        """Retrieves the callback for events matching one of get_subscriptions().
+
+        The plugin only invokes the handler for events matching the subscription, so
+        specialized handlers can skip re-checking the device and attribute. Defaults
+        to on_device_event().
+        """
+        return self.on_device_event
+
     @override
     def initialize(self, _):
         # When initialized with the engine, register with the plugin
@@ -35,6 +119,8 @@ class HubitatCondition(AbstractCondition):
 
 
 class AttributeChangeCondition(HubitatCondition):
+    __slots__ = ("_device_id", "_attr_name", "_prev_value", "_curr_value")
+
     def __init__(self, plugin: "HubitatPlugin", device_id: int, attr_name: str):
         super().__init__(plugin)
         self._device_id = device_id
@@ -49,14 +135,17 @@ class AttributeChangeCondition(HubitatCondition):
 
     @override
     def on_device_event(self, device_id: int, attr_name: str, new_value: Any):
-        if self._device_id == device_id and self._attr_name == attr_name:
-            self._prev_value = self._curr_value
-            self._curr_value = new_value
+        # Only subscribed to our own attribute, so no need to check which one changed
+        self._prev_value, self._curr_value = self._curr_value, new_value
 
     @override
     def get_device_ids(self) -> list[int]:
         return [self._device_id]
 
+    @override
+    def get_subscriptions(self) -> list[tuple[int, str]]:
+        return [(self._device_id, self._attr_name)]
+
     @override
     def evaluate(self) -> bool:
         return bool(self._prev_value != self._curr_value)
@@ -65,6 +154,17 @@ class AttributeChangeCondition(HubitatCondition):
 class DynamicDeviceAttributeCondition(HubitatCondition):
     """A condition for the comparison of a device attribute against another one"""
 
+    __slots__ = (
+        "_left_device_id",
+        "_left_attr_name",
+        "_right_device_id",
+        "_right_attr_name",
+        "_operator",
+        "_compare",
+        "_left_value",
+        "_right_value",
+    )
+
     def __init__(
         self,
         plugin: "HubitatPlugin",
@@ -76,6 +176,7 @@ class DynamicDeviceAttributeCondition(HubitatCondition):
         self._left_device_id, self._left_attr_name = first
         self._right_device_id, self._right_attr_name = second
         self._operator = operator
+        self._compare = _resolve_operator(operator)
         self._left_value: Any | None = None
         self._right_value: Any | None = None
 
@@ -91,47 +192,53 @@ class DynamicDeviceAttributeCondition(HubitatCondition):
     def on_device_event(self, device_id: int, attr_name: str, new_value: Any):
         if device_id == self._left_device_id and attr_name == self._left_attr_name:
             self._left_value = new_value
-        elif device_id == self._right_device_id and attr_name == self._right_attr_name:
+        if device_id == self._right_device_id and attr_name == self._right_attr_name:
             self._right_value = new_value
 
+    def _set_left(self, _device_id: int, _attr_name: str, new_value: Any):
+        self._left_value = new_value
+
+    def _set_right(self, _device_id: int, _attr_name: str, new_value: Any):
+        self._right_value = new_value
+
     @override
     def get_device_ids(self) -> list[int]:
         return [self._left_device_id, self._right_device_id]
 
+    @override
+    def get_subscriptions(self) -> list[tuple[int, str]]:
+        return [
+            (self._left_device_id, self._left_attr_name),
+            (self._right_device_id, self._right_attr_name),
+        ]
+
+    @override
+    def get_event_handler(self, subscription: tuple[int, str]) -> DeviceEventHandler:
+        left = (self._left_device_id, self._left_attr_name)
+        right = (self._right_device_id, self._right_attr_name)
+        if left == right:
+            # Both sides watch the same attribute, let on_device_event update both
+            return self.on_device_event
+        return self._set_left if subscription == left else self._set_right
+
     @override
     def evaluate(self) -> bool:
-        match self._operator:
-            case "=" | "==":
-                return bool(self._left_value == self._right_value)
-            case "!=" | "<>":
-                return bool(self._left_value != self._right_value)
-            case ">":
-                # Handle None values - ordering comparisons with None are undefined
-                if self._left_value is not None and self._right_value is not None:
-                    return bool(self._left_value > self._right_value)
-                return False
-            case ">=":
-                # Handle None values - ordering comparisons with None are undefined
-                if self._left_value is not None and self._right_value is not None:
-                    return bool(self._left_value >= self._right_value)
-                return False
-            case "<":
-                # Handle None values - ordering comparisons with None are undefined
-                if self._left_value is not None and self._right_value is not None:
-                    return bool(self._left_value < self._right_value)
-                return False
-            case "<=":
-                # Handle None values - ordering comparisons with None are undefined
-                if self._left_value is not None and self._right_value is not None:
-                    return bool(self._left_value <= self._right_value)
-                return False
-            case _:
-                raise ValueError(f"Unknown operator: {self._operator}")
+        return _compare_values(self._compare, self._left_value, self._right_value)
 
 
 class StaticDeviceAttributeCondition(HubitatCondition):
     """A condition for the comparison of a device attribute against a static value"""
 
+    __slots__ = (
+        "_device_id",
+        "_attr_name",
+        "_device_value",
+        "_static_value",
+        "_operator",
+        "_compare",
+        "_cast",
+    )
+
     def __init__(
         self,
         plugin: "HubitatPlugin",
@@ -146,6 +253,29 @@ class StaticDeviceAttributeCondition(HubitatCondition):
         self._device_value = None
         self._static_value = static_value
         self._operator = operator
+        self._compare = _resolve_operator(operator)
+        self._cast = self._resolve_caster(static_value)
+
+    @staticmethod
+    def _resolve_caster(static_value: Any) -> Callable[[Any], Any]:
+        """Pick the function that casts incoming values to the static value's type.
+
+        Args:
+            static_value: The value device values will be compared against
+
+        Returns:
+            The casting function for the static value's type
+        """
+        # bool is checked first since it is a subclass of int
+        if isinstance(static_value, bool):
+            return _cast_bool
+        elif isinstance(static_value, int):
+            return _cast_int
+        elif isinstance(static_value, float):
+            return float
+        elif isinstance(static_value, str):
+            return str
+        return _identity
 
     def _cast_value(self, value: Any) -> Any:
         """Cast the incoming value to match the model value type.
@@ -160,17 +290,7 @@ class StaticDeviceAttributeCondition(HubitatCondition):
             return None
 
         try:
-            if isinstance(self._static_value, bool):
-                if isinstance(value, str):
-                    return value.lower() in ("true", "1", "yes", "on", "active", "open")
-                return bool(value)
-            elif isinstance(self._static_value, type(int)):
-                return int(value)
-            elif isinstance(self._static_value, type(float)):
-                return float(value)
-            elif isinstance(self._static_value, type(str)):
-                return str(value)
-            return value
+            return self._cast(value)
         except (ValueError, TypeError):
             return value
 
@@ -184,33 +304,25 @@ class StaticDeviceAttributeCondition(HubitatCondition):
 
     @override
     def on_device_event(self, device_id: int, attr_name: str, new_value: Any):
-        if device_id == self._device_id and self._attr_name == attr_name:
-            self._device_value = self._cast_value(new_value)
+        # Only subscribed to our own attribute, so no need to check which one changed
+        self._device_value = self._cast_value(new_value)
 
     @override
     def get_device_ids(self) -> list[int]:
         return [self._device_id]
 
+    @override
+    def get_subscriptions(self) -> list[tuple[int, str]]:
+        return [(self._device_id, self._attr_name)]
+
     @override
     def evaluate(self) -> bool:
-        match self._operator:
-            case "=" | "==":
-                return bool(self._device_value == self._static_value)
-            case "!=" | "<>":
-                return bool(self._device_value != self._static_value)
-            case ">":
-                return bool(self._device_value > self._static_value)
-            case ">=":
-                return bool(self._device_value >= self._static_value)
-            case "<":
-                return bool(self._device_value < self._static_value)
-            case "<=":
-                return bool(self._device_value <= self._static_value)
-            case _:
-                raise ValueError(f"Unknown operator: {self._operator}")
+        return _compare_values(self._compare, self._device_value, self._static_value)
 
 
 class Attribute:
+    __slots__ = ("_plugin", "_device_id", "_attr_name", "_he_client")
+
     def __init__(
         self,
         plugin: "HubitatPlugin",
@@ -272,16 +384,22 @@ class Attribute:
 
 
 class Command:
+    __slots__ = ("_device_id", "_command_name", "_he_client")
+
     def __init__(self, device_id: int, command_name: str, he_client: HubitatClient):
         self._device_id = device_id
         self._command_name = command_name
         self._he_client = he_client
 
     async def __call__(self, *args: Any, **_: Any) -> Any:
-        await self._he_client.send_command(self._device_id, self._command_name, *args)
+        await self._he_client.send_command(
+            self._device_id, self._command_name, list(args)
+        )
 
 
 class Device:
+    __slots__ = ("_plugin", "_he_client", "_device", "_accessors")
+
     def __init__(
         self, plugin: "HubitatPlugin", he_client: HubitatClient, device: HubitatDevice
     ):
@@ -289,17 +407,24 @@ class Device:
         self._he_client = he_client
         self._device = device
 
+        # Build the accessors up front, attributes win over same-named commands
+        device_id = int(device.id)
+        self._accessors: dict[str, Attribute | Command] = {
+            attr.name: Attribute(plugin, device_id, attr.name, he_client)
+            for attr in device.attributes
+        }
+        for capability in device.capabilities.values():
+            for cmd in capability.commands:
+                if cmd.name not in self._accessors:
+                    self._accessors[cmd.name] = Command(device_id, cmd.name, he_client)
+
     def __getattr__(self, attr_name: str) -> Attribute | Command:
-        if self._device.has_attribute(attr_name):
-            return Attribute(
-                self._plugin, int(self._device.id), attr_name, self._he_client
-            )
-        elif self._device.has_command(attr_name):
-            return Command(int(self._device.id), attr_name, self._he_client)
-        else:
+        try:
+            return self._accessors[attr_name]
+        except KeyError:
             raise AttributeError(
                 f"Attribute or Command {attr_name} not found on device {self._device.id}"
-            )
+            ) from None
 
 
 class HubitatUtility: